@@ -0,0 +1,212 @@
+"""
+Indexed archive storage for the Downloads corpus
+Packs historical circulars from Downloads/YYYY/Mon/*.pdf into one stored
+(uncompressed) zip per year under Downloads/archive/, with a central JSON
+index of each member's data offset, size and SHA-256. Readers mmap the
+archive and slice members out by offset, so a bulk run touches one file
+per year instead of one per circular. Only complete years whose months are
+all past the recent window are packed, so each year archive is written
+once and never re-committed; the current year stays as loose files for
+the daily pipeline.
+"""
+
+import os
+import glob
+import json
+import mmap
+import struct
+import zipfile
+import hashlib
+import argparse
+from datetime import date
+
+DOWNLOADS_DIR = "Downloads"
+ARCHIVE_DIR = os.path.join(DOWNLOADS_DIR, "archive")
+INDEX_FILE = os.path.join(ARCHIVE_DIR, "index.json")
+KEEP_RECENT_MONTHS = 3  # a year is packed once its December is older than these recent months
+
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+MONTHS = {m: i for i, m in enumerate(["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                                      "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)}
+
+def load_index(index_file=INDEX_FILE):
+    """{member name: {"archive", "offset", "size", "sha256"}}; member names look like 2025/Aug/x.pdf"""
+    if not os.path.exists(index_file):
+        return {}
+    with open(index_file, "r") as f:
+        return json.load(f)
+
+def save_index(index, index_file=INDEX_FILE):
+    tmp_file = index_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(index, f, indent=1, sort_keys=True)
+    os.replace(tmp_file, index_file)
+
+def member_name(path):
+    return os.path.relpath(path, DOWNLOADS_DIR).replace(os.sep, "/")
+
+def loose_pdfs():
+    """Loose circulars in Downloads/YYYY/Mon/"""
+    return sorted(glob.glob(os.path.join(DOWNLOADS_DIR, "[0-9][0-9][0-9][0-9]", "*", "*.pdf")))
+
+def archived_pdfs(index=None):
+    """Paths the archived circulars had as loose files (Downloads/YYYY/Mon/x.pdf)"""
+    index = load_index() if index is None else index
+    return [os.path.join(DOWNLOADS_DIR, *name.split("/")) for name in sorted(index)]
+
+def month_of(path):
+    year, month = member_name(path).split("/")[:2]
+    return date(int(year), MONTHS[month], 1)
+
+def cutoff_month(keep_recent_months, today=None):
+    today = today or date.today()
+    months = today.year * 12 + today.month - 1 - (keep_recent_months - 1)
+    return date(months // 12, months % 12 + 1, 1)
+
+def data_offset(archive_file, info):
+    """Offset of a member's data, read from its local file header"""
+    archive_file.seek(info.header_offset)
+    header = LOCAL_HEADER.unpack(archive_file.read(LOCAL_HEADER.size))
+    name_length, extra_length = header[-2], header[-1]
+    return info.header_offset + LOCAL_HEADER.size + name_length + extra_length
+
+def index_archive(zip_path, index):
+    """Add every member of one archive to the index"""
+    archive_name = os.path.basename(zip_path)
+    with zipfile.ZipFile(zip_path) as zf, open(zip_path, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{zip_path}:{info.filename} is compressed; archives must be stored")
+            offset = data_offset(f, info)
+            f.seek(offset)
+            index[info.filename] = {
+                "archive": archive_name,
+                "offset": offset,
+                "size": info.file_size,
+                "sha256": hashlib.sha256(f.read(info.file_size)).hexdigest(),
+            }
+
+class ArchiveReader:
+    """Random access to archived circulars through mmap'd year archives"""
+
+    def __init__(self, index=None):
+        self.index = load_index() if index is None else index
+        self.maps = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, path):
+        return member_name(path) in self.index
+
+    def read(self, path):
+        """Bytes of an archived circular, looked up by its former loose path"""
+        entry = self.index[member_name(path)]
+        archive = self.maps.get(entry["archive"])
+        if archive is None:
+            with open(os.path.join(ARCHIVE_DIR, entry["archive"]), "rb") as f:
+                archive = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.maps[entry["archive"]] = archive
+        return archive[entry["offset"]:entry["offset"] + entry["size"]]
+
+    def sha256(self, path):
+        return self.index[member_name(path)]["sha256"]
+
+    def close(self):
+        for archive in self.maps.values():
+            archive.close()
+        self.maps.clear()
+
+def pack(keep_recent_months=KEEP_RECENT_MONTHS, today=None):
+    """Move the loose circulars of complete years older than the recent months into year archives"""
+    cutoff = cutoff_month(keep_recent_months, today)
+    by_year = {}
+    for path in loose_pdfs():
+        year = month_of(path).year
+        if date(year, 12, 1) < cutoff:
+            by_year.setdefault(year, []).append(path)
+
+    if not by_year:
+        print(f"✅ No complete year to archive before {cutoff.strftime('%b %Y')}")
+        return
+
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    index = load_index()
+    for year, paths in sorted(by_year.items()):
+        zip_path = os.path.join(ARCHIVE_DIR, f"{year}.zip")
+        with zipfile.ZipFile(zip_path, "a", compression=zipfile.ZIP_STORED) as zf:
+            existing = set(zf.namelist())
+            for path in paths:
+                if member_name(path) not in existing:
+                    zf.write(path, member_name(path))
+        index_archive(zip_path, index)
+        # Persist before deleting anything, so a later failure never leaves
+        # removed circulars missing from the index
+        save_index(index)
+
+        # Only drop loose files whose archived copy reads back identically
+        with ArchiveReader(index) as reader:
+            for path in paths:
+                with open(path, "rb") as f:
+                    if reader.read(path) != f.read():
+                        raise ValueError(f"Archived copy of {path} differs from the loose file")
+                os.remove(path)
+        print(f"   📦 {zip_path}: archived {len(paths)} circulars")
+
+    for year in by_year:
+        year_dir = os.path.join(DOWNLOADS_DIR, str(year))
+        for month_dir in glob.glob(os.path.join(year_dir, "*")):
+            if os.path.isdir(month_dir) and not os.listdir(month_dir):
+                os.rmdir(month_dir)
+        if not os.listdir(year_dir):
+            os.rmdir(year_dir)
+    print(f"✅ Archived {', '.join(str(year) for year in sorted(by_year))}; index has {len(index)} members")
+
+def unpack(year):
+    """Restore one year's archived circulars as loose files and drop the archive"""
+    zip_path = os.path.join(ARCHIVE_DIR, f"{year}.zip")
+    if not os.path.exists(zip_path):
+        print(f"❌ No archive for {year} in {ARCHIVE_DIR}")
+        return False
+    index = load_index()
+    names = [name for name in index if name.startswith(f"{year}/")]
+    with ArchiveReader(index) as reader:
+        for name in names:
+            path = os.path.join(DOWNLOADS_DIR, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(reader.read(path))
+            del index[name]
+    os.remove(zip_path)
+    save_index(index)
+    print(f"✅ Restored {len(names)} circulars for {year}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack historical circulars into indexed year archives')
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack_parser = commands.add_parser('pack', help='Archive loose circulars older than the recent months')
+    pack_parser.add_argument('--keep-months', type=int, default=KEEP_RECENT_MONTHS,
+                             help='Recent months (including the current one) a packed year must be older than')
+    unpack_parser = commands.add_parser('unpack', help="Restore a year's circulars as loose files")
+    unpack_parser.add_argument('year', type=int)
+    commands.add_parser('list', help='Show archived members per archive')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        pack(args.keep_months)
+    elif args.command == 'unpack':
+        return 0 if unpack(args.year) else 1
+    else:
+        counts = {}
+        for entry in load_index().values():
+            counts[entry["archive"]] = counts.get(entry["archive"], 0) + 1
+        for archive, count in sorted(counts.items()):
+            print(f"{archive}: {count} circulars")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
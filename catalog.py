@@ -0,0 +1,168 @@
+"""
+Canonical catalog of Hindalco primary aluminium products
+Every product has a stable ID, the canonical name written to the CSVs, the
+CSV file that holds its series and the description variants seen in
+circulars. Extracted descriptions resolve to a product through a
+precomputed normalized-alias index (O(1)). Unknown descriptions resolve to
+None so callers can flag them instead of starting a new CSV series; a
+character trigram index suggests the closest product for the flag, since
+a near-identical description can be a different grade (HAC-1 vs HAC-2).
+"""
+
+import re
+import sys
+
+SUGGEST_THRESHOLD = 0.5  # minimum trigram similarity to suggest a closest product
+
+PRODUCTS = [
+    {
+        "id": "P0406",
+        "name": "P0406 (Si 0.04% max, Fe 0.06% max) 99.85% (min)",
+        "csv_filename": "P0406_(Si_0.04percent_max_Fe_0.06percent_max)_99.85percent_(min).csv",
+        "aliases": [],
+    },
+    {
+        "id": "P0610",
+        "name": "P0610 (99.85% min) /P1020/ EC Grade Ingot & Sow 99.7% (min) / Cast Bar",
+        "csv_filename": "P0610_(99.85percent_min)_-P1020-_EC_Grade_Ingot_&_Sow_99.7percent_(min)_-_Cast_Bar.csv",
+        "aliases": [],
+    },
+    {
+        "id": "CG_INGOT",
+        "name": "CG Grade Ingot & Sow 99.5% (min) purity",
+        "csv_filename": "CG_Grade_Ingot_&_Sow_99.5percent_(min)_purity.csv",
+        "aliases": [],
+    },
+    {
+        "id": "EC_WIRE_ROD",
+        "name": "EC Grade Wire Rods, Dia 9.5 mm - Conductivity 61% min",
+        "csv_filename": "EC_Grade_Wire_Rods_Dia_9.5_mm_-_Conductivity_61percent_min.csv",
+        "aliases": [],
+    },
+    {
+        "id": "ALLOY_WIRE_ROD",
+        "name": "Alloy Wire Rod - Dia 9.5 mm (HAC-1)",
+        "csv_filename": "Alloy_Wire_Rod_-_Dia_9.5_mm_(HAC-1).csv",
+        "aliases": [],
+    },
+    {
+        "id": "BILLETS_7_8_9",
+        "name": "Billets (AA6063) Dia 7\", 8\" & 9\" - subject to availability",
+        "csv_filename": "Billets_(AA6063)_Dia_7_8_&_9_-_subject_to_availability.csv",
+        "aliases": [],
+    },
+    {
+        "id": "BILLETS_5_6",
+        "name": "Billets (AA6063) Dia 5\" , 6\" - subject to availability",
+        "csv_filename": "Billets_(AA6063)_Dia_5__6_-_subject_to_availability.csv",
+        "aliases": [],
+    },
+]
+
+class Product:
+    def __init__(self, id, name, csv_filename, aliases):
+        self.id = id
+        self.name = name
+        self.csv_filename = csv_filename
+        self.aliases = aliases
+
+    def __repr__(self):
+        return f"Product({self.id!r})"
+
+def normalize(text):
+    """Case, spacing and punctuation insensitive form of a description"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower().replace("%", " percent ")).split())
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class Catalog:
+    """Product lookup by ID or normalized alias, with trigram suggestions for unknowns"""
+
+    def __init__(self, products=PRODUCTS):
+        self.products = [Product(**p) for p in products]
+        self.by_id = {}
+        self.by_alias = {}
+        self.by_trigram = {}
+        self.alias_trigrams = {}
+
+        for product in self.products:
+            if product.id in self.by_id:
+                raise ValueError(f"Duplicate product ID: {product.id}")
+            self.by_id[product.id] = product
+            for alias in [product.name] + product.aliases:
+                key = normalize(alias)
+                other = self.by_alias.setdefault(key, product)
+                if other is not product:
+                    raise ValueError(f"Alias {alias!r} maps to both {other.id} and {product.id}")
+                grams = trigrams(key)
+                self.alias_trigrams[key] = grams
+                for gram in grams:
+                    self.by_trigram.setdefault(gram, set()).add(key)
+
+    def resolve(self, description):
+        """Product for an extracted description, or None if it is unknown"""
+        return self.by_alias.get(normalize(description))
+
+    def closest(self, description):
+        """(product, similarity) of the most similar known alias, or (None, 0.0)"""
+        grams = trigrams(normalize(description))
+        overlap = {}
+        for gram in grams:
+            for alias in self.by_trigram.get(gram, ()):
+                overlap[alias] = overlap.get(alias, 0) + 1
+        best, best_score = None, 0.0
+        for alias, shared in overlap.items():
+            score = shared / len(grams | self.alias_trigrams[alias])
+            if score > best_score:
+                best, best_score = alias, score
+        return (self.by_alias[best], best_score) if best else (None, 0.0)
+
+    def canonicalize_rows(self, rows):
+        """Map (date, description, price) rows to canonical product names
+
+        Returns (known, unknown): known rows carry the catalog name,
+        unknown rows are returned as (row, reasons) for quarantine.
+        """
+        known, unknown = [], []
+        for row in rows:
+            date, desc, price = row
+            product = self.resolve(desc)
+            if product is not None:
+                known.append((date, product.name, price))
+                continue
+            reason = "unknown product"
+            suggestion, score = self.closest(desc)
+            if suggestion and score >= SUGGEST_THRESHOLD:
+                reason += f" (closest {suggestion.id} at {score:.0%}; add an alias if it is the same grade)"
+            unknown.append((row, [reason]))
+        return known, unknown
+
+CATALOG = Catalog()
+
+def resolve(description):
+    return CATALOG.resolve(description)
+
+def canonicalize_rows(rows):
+    return CATALOG.canonicalize_rows(rows)
+
+def csv_filename(product_name):
+    """CSV file of a catalog product, looked up by name or alias"""
+    product = CATALOG.resolve(product_name)
+    if product is None:
+        raise KeyError(f"Unknown product: {product_name}")
+    return product.csv_filename
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        for description in sys.argv[1:]:
+            product = CATALOG.resolve(description)
+            if product:
+                print(f"{description!r} -> {product.id}")
+            else:
+                suggestion, score = CATALOG.closest(description)
+                print(f"{description!r} -> UNKNOWN (closest {suggestion.id if suggestion else '-'} at {score:.0%})")
+    else:
+        for product in CATALOG.products:
+            print(f"{product.id:<15} {product.name}  [{product.csv_filename}]")
@@ -13,6 +13,18 @@ LOG_FILE = os.path.join(LOG_DIR, "downloader.log")
 # Schedule configuration
 DOWNLOAD_TIME = "16:00"  # 4 PM in 24-hour format
 
+# Jobs run by the scheduler: script to run, daily times (local, IST) and timeout in seconds.
+# Jobs in the same group never run at the same time; they all write Downloads/, csv/ and events/
+SCHEDULE_JOBS = {
+    "download": {"command": ["run.py", "--extract"], "times": [DOWNLOAD_TIME, "21:30"], "timeout": 600,
+                 "group": "pipeline"},
+    "backup": {"command": ["run_backup.py"], "times": ["16:15", "21:45"], "timeout": 900,
+               "group": "pipeline"},
+    "csv_update": {"command": ["csv_from_pdf.py"], "times": ["16:45", "21:55"], "timeout": 300,
+                   "group": "pipeline"},
+}
+SCHEDULER_STATE_FILE = os.path.join(LOG_DIR, "scheduler_state.json")
+
 # File naming configuration
 FILE_NAME_TEMPLATE = "Hindalco_Circular_{day}_{month}_{year}.pdf"
 
@@ -22,9 +34,18 @@ MAX_RETRIES = 3
 RETRY_DELAY = 5  # seconds between retries
 
 # Logging configuration
-LOG_LEVEL = "INFO"
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").strip().upper()  # DEBUG also logs every extracted row
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+LOG_ROTATION = "size"  # "size" or "time"
+LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate after 5 MB when rotating by size
+LOG_ROTATE_WHEN = "midnight"  # rotation interval when rotating by time
+LOG_BACKUP_COUNT = 5
+LOG_JSON = False  # write the log file as JSON lines
+# Only one process may write LOG_FILE; the scheduler sets this to "0" for its
+# jobs and writes their output to the log itself
+LOG_TO_FILE = os.environ.get("LOG_TO_FILE", "1") != "0"
+LOG_JOB_FORMAT = "%(levelname)s - %(message)s"  # console format when not writing the file
 
 # Create directories if they don't exist
 os.makedirs(DOWNLOAD_DIR, exist_ok=True)
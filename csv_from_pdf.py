@@ -1,12 +1,19 @@
 import os
+import io
 import csv
+import logging
 from datetime import datetime, timedelta
 from PyPDF2 import PdfReader
+from matrix_export import append_to_matrix
+from validation import validate_rows, quarantine_rows, source_date_from_filename
+from catalog import canonicalize_rows, csv_filename
+from csv_store import content_hash, file_hash
+from event_log import record_rows, logged_sources
 
 CSV_DIR = "csv"
+PARSER_VERSION = "daily-1"
 
-def sanitize_filename(text):
-    return text.replace("/", "-").replace("\"", "").replace(",", "").replace(":", "").replace(" ", "_").replace("%", "percent")
+logger = logging.getLogger(__name__)
 
 def extract_date_from_text(text):
     import re
@@ -39,10 +46,14 @@ def clean_description(desc):
     
     return desc
 
-def extract_table_data(pdf_path):
-    """Extract data from PDF with improved parsing and duplicate prevention"""
+def extract_table_data(pdf_path, data=None):
+    """Extract data from PDF with improved parsing and duplicate prevention
+    
+    If data (the PDF bytes, e.g. a buffer just filled by the downloader) is
+    given, it is parsed from memory instead of reading pdf_path from disk.
+    """
     try:
-        reader = PdfReader(pdf_path)
+        reader = PdfReader(io.BytesIO(data) if data is not None else pdf_path)
         text = "\n".join([page.extract_text() for page in reader.pages])
         lines = text.splitlines()
         
@@ -109,7 +120,7 @@ def extract_table_data(pdf_path):
                                                 seen_items.add(unique_key)
                                                 data_rows.append((current_date, desc, price))
                                                 price_found = True
-                                                print(f"   ✅ Item {item_number}: {desc} → ₹{price:,}")
+                                                logger.debug("Item %s: %s → ₹%s", item_number, desc, price)
                                                 break
                                 except (ValueError, IndexError):
                                     continue
@@ -127,7 +138,7 @@ def extract_table_data(pdf_path):
                                     if len(desc) > 5 and unique_key not in seen_items:
                                         seen_items.add(unique_key)
                                         data_rows.append((current_date, desc, price))
-                                        print(f"   ✅ Item {item_number} (next line): {desc} → ₹{price:,}")
+                                        logger.debug("Item %s (next line): %s → ₹%s", item_number, desc, price)
                                         
                         except Exception:
                             continue
@@ -151,7 +162,7 @@ def extract_table_data(pdf_path):
                                         seen_items.add(unique_key)
                                         data_rows.append((current_date, desc, price))
                                         price_found = True
-                                        print(f"   ✅ Fallback: {desc} → ₹{price:,}")
+                                        logger.debug("Fallback: %s → ₹%s", desc, price)
                                         break
                             except (ValueError, IndexError):
                                 continue
@@ -168,7 +179,7 @@ def extract_table_data(pdf_path):
 def append_to_csv(row):
     """Append data to CSV with duplicate checking"""
     date, desc, price = row
-    filename = sanitize_filename(desc) + ".csv"
+    filename = csv_filename(desc)
     csv_path = os.path.join(CSV_DIR, filename)
     os.makedirs(CSV_DIR, exist_ok=True)
     
@@ -235,15 +246,15 @@ def find_todays_pdf():
     
     return None
 
-def process_pdf(pdf_path):
-    """Process PDF and update CSV files"""
+def process_pdf(pdf_path, data=None):
+    """Process PDF and update CSV files; data optionally holds the PDF bytes already in memory"""
     print(f"🔄 Processing: {pdf_path}")
     
-    if not os.path.exists(pdf_path):
+    if data is None and not os.path.exists(pdf_path):
         print(f"❌ PDF file not found: {pdf_path}")
         return False
     
-    extracted_rows = extract_table_data(pdf_path)
+    extracted_rows = extract_table_data(pdf_path, data=data)
     
     if not extracted_rows:
         print("⚠️ No data extracted from PDF")
@@ -251,13 +262,35 @@ def process_pdf(pdf_path):
     
     print(f"📊 Processing {len(extracted_rows)} extracted rows")
     
-    for row in extracted_rows:
-        date, desc, price = row
+    source_sha256 = content_hash(data) if data is not None else file_hash(pdf_path)
+    known_rows, unknown_rows = canonicalize_rows(extracted_rows)
+    accepted_rows, rejected_rows, released = validate_rows(known_rows, source_date=source_date_from_filename(pdf_path))
+    rejected_rows = unknown_rows + rejected_rows
+    if rejected_rows:
+        quarantine_rows(rejected_rows, pdf_path, source_sha256)
+    
+    if not accepted_rows:
+        print("⚠️ No rows passed validation")
+        return False
+    
+    # Quarantined rows released by a confirmed new level predate this circular
+    released_rows = [row for row, source, sha in released]
+    for row in sorted(released_rows) + accepted_rows:
         append_to_csv(row)
     
+    append_to_matrix(released_rows + accepted_rows)
+    
+    for row, source, sha in released:
+        record_rows([row], source, sha, PARSER_VERSION)
+    if (source_sha256, PARSER_VERSION) not in logged_sources():
+        record_rows(accepted_rows, pdf_path, source_sha256, PARSER_VERSION)
+    
     return True
 
 if __name__ == "__main__":
+    from log_setup import setup_logging
+    setup_logging()
+    
     print("🚀 Starting daily CSV update...")
     
     # Find today's PDF
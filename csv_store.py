@@ -0,0 +1,91 @@
+"""
+Change-aware CSV writer for the per-product price files
+Renders each file in memory, compares content hashes with the file on disk
+and only rewrites (atomically) the files whose content actually changed
+"""
+
+import os
+import io
+import csv
+import hashlib
+import tempfile
+
+CSV_HEADER = ["Date", "Product", "Price"]
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+def render_csv(rows, header=CSV_HEADER):
+    """Render rows to CSV bytes exactly as csv.writer would write them to disk"""
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+def file_hash(path):
+    """Hash of the file on disk, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def new_file_mode():
+    """Mode a plain open() would give a new file under the current umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def write_atomic(path, data):
+    """Write data to a temp file in the same directory and rename it into place
+
+    The temp file is fsynced before the rename and gets the mode of the file
+    it replaces (mkstemp creates it 0600), or the umask default for new files.
+    """
+    dir_path = os.path.dirname(path) or "."
+    os.makedirs(dir_path, exist_ok=True)
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = new_file_mode()
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=".tmp-", suffix=".csv")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_if_changed(path, data):
+    """Write data to path only if its hash differs from the file on disk"""
+    old_hash = file_hash(path)
+    if old_hash == content_hash(data):
+        return UNCHANGED
+    write_atomic(path, data)
+    return CREATED if old_hash is None else UPDATED
+
+def write_csv_if_changed(path, rows, header=CSV_HEADER):
+    return write_if_changed(path, render_csv(rows, header))
+
+def print_change_summary(results):
+    """Print a summary of a bulk write; results maps filename -> status"""
+    changed = {status: sorted(name for name, s in results.items() if s == status)
+               for status in (CREATED, UPDATED, UNCHANGED)}
+
+    print(f"\n📝 CSV change summary: {len(changed[CREATED])} created, "
+          f"{len(changed[UPDATED])} updated, {len(changed[UNCHANGED])} unchanged")
+    for status in (CREATED, UPDATED):
+        for name in changed[status]:
+            print(f"   {'🆕' if status == CREATED else '✏️'} {status}: {name}")
@@ -4,22 +4,15 @@ import logging
 from datetime import datetime
 import time
 from config import *
-
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format=LOG_FORMAT,
-    datefmt=LOG_DATE_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+from log_setup import setup_logging
 
 logger = logging.getLogger(__name__)
 
 class HindalcoPDFDownloader:
-    def __init__(self):
+    def __init__(self, base_url=BASE_URL, download_root="Downloads", retry_delay=RETRY_DELAY):
+        self.base_url = base_url
+        self.download_root = download_root
+        self.retry_delay = retry_delay
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
@@ -39,7 +32,7 @@ class HindalcoPDFDownloader:
 
     def construct_url(self, date):
         day, month, year = self.format_date_for_url(date)
-        return BASE_URL.format(day, month, year)
+        return self.base_url.format(day, month, year)
 
     def construct_filename(self, date):
         day, month, year = self.format_date_for_filename(date)
@@ -48,11 +41,12 @@ class HindalcoPDFDownloader:
     def create_directory_structure(self, date):
         year = date.strftime("%Y")
         month = date.strftime("%b")
-        dir_path = os.path.join("Downloads", year, month)
+        dir_path = os.path.join(self.download_root, year, month)
         os.makedirs(dir_path, exist_ok=True)
         return dir_path
 
-    def download_pdf(self, url, filepath):
+    def download_pdf(self, url, filepath, buffer=None):
+        """Download url to filepath; if a bytearray buffer is given, the PDF bytes are also kept in it"""
         for attempt in range(MAX_RETRIES):
             try:
                 logger.info(f"Attempting to download from: {url} (Attempt {attempt + 1}/{MAX_RETRIES})")
@@ -71,10 +65,24 @@ class HindalcoPDFDownloader:
                         logger.warning("File content does not start with '%PDF-', skipping save.")
                         return False
 
-                    with open(filepath, 'wb') as f:
-                        f.write(first_bytes)
-                        for chunk in response.raw:
-                            f.write(chunk)
+                    if buffer is not None:
+                        del buffer[:]
+                        buffer.extend(first_bytes)
+
+                    # Stream to a .part file and rename it only once the body is complete,
+                    # so a failed transfer never leaves a truncated PDF at filepath
+                    part_path = filepath + ".part"
+                    try:
+                        with open(part_path, 'wb') as f:
+                            f.write(first_bytes)
+                            for chunk in response.iter_content(chunk_size=65536):
+                                f.write(chunk)
+                                if buffer is not None:
+                                    buffer.extend(chunk)
+                        os.replace(part_path, filepath)
+                    finally:
+                        if os.path.exists(part_path):
+                            os.remove(part_path)
 
                     file_size = os.path.getsize(filepath)
                     logger.info(f"Successfully downloaded PDF: {filepath} ({file_size} bytes)")
@@ -87,15 +95,15 @@ class HindalcoPDFDownloader:
                 else:
                     logger.warning(f"Unexpected status code: {response.status_code}")
                     if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
+                        time.sleep(self.retry_delay)
                         continue
                     return False
 
             except requests.exceptions.RequestException as e:
                 logger.error(f"Request failed: {str(e)}")
                 if attempt < MAX_RETRIES - 1:
-                    logger.info(f"Retrying in {RETRY_DELAY} seconds...")
-                    time.sleep(RETRY_DELAY)
+                    logger.info(f"Retrying in {self.retry_delay} seconds...")
+                    time.sleep(self.retry_delay)
                 else:
                     logger.error("Max retries reached. Download failed.")
                     return False
@@ -106,11 +114,11 @@ class HindalcoPDFDownloader:
 
         return False
 
-    def download_today(self):
+    def download_today(self, buffer=None):
         today = datetime.now()
-        return self.download_for_date(today)
+        return self.download_for_date(today, buffer=buffer)
 
-    def download_for_date(self, date):
+    def download_for_date(self, date, buffer=None):
         logger.info(f"Checking for PDF for date: {date.strftime('%Y-%m-%d')}")
         url = self.construct_url(date)
         filename = self.construct_filename(date)
@@ -121,7 +129,7 @@ class HindalcoPDFDownloader:
             logger.info(f"File already exists: {filepath}")
             return True
 
-        success = self.download_pdf(url, filepath)
+        success = self.download_pdf(url, filepath, buffer=buffer)
 
         if success:
             logger.info(f"Download completed successfully for {date.strftime('%Y-%m-%d')}")
@@ -143,4 +151,5 @@ def main():
     logger.info("Hindalco PDF Downloader finished")
 
 if __name__ == "__main__":
+    setup_logging()
     main()
@@ -0,0 +1,168 @@
+"""
+Append-only log of extraction events
+Every accepted extracted row is recorded as one JSON line with its source
+PDF, the PDF's SHA-256, the parser version and a timestamp. Corrections are
+appended as events too, never edited in place. Later events override
+earlier ones, so a re-parse by a fixed parser replaces the seeded or older
+prices. A small side index of logged (SHA-256, parser version) pairs lets
+the daily run skip already-logged PDFs without scanning the log. The
+materializer rebuilds
+all per-product CSVs (and the matrix) from the log in one streaming pass,
+without re-parsing any PDF.
+"""
+
+import os
+import csv
+import glob
+import json
+import argparse
+from datetime import datetime
+from csv_store import write_csv_if_changed, print_change_summary
+from catalog import CATALOG
+from matrix_export import build_matrix, CSV_DIR, MATRIX_FILE
+
+EVENT_LOG_DIR = "events"
+EVENT_LOG_FILE = os.path.join(EVENT_LOG_DIR, "extractions.jsonl")
+SOURCES_SUFFIX = ".sources"  # side index next to the log: one "sha256 parser_version" line per logged PDF
+
+ROW = "row"
+CORRECTION = "correction"
+
+def append_events(events, log_file=EVENT_LOG_FILE):
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    with open(log_file, "a", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+def read_events(log_file=EVENT_LOG_FILE):
+    """Stream events from the log, one dict per line"""
+    if not os.path.exists(log_file):
+        return
+    with open(log_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def sources_path(log_file):
+    return log_file + SOURCES_SUFFIX
+
+def rebuild_sources(log_file=EVENT_LOG_FILE):
+    """Rewrite the side index from a full scan of the log"""
+    sources = {(e["source_sha256"], e["parser_version"]) for e in read_events(log_file)
+               if e["type"] == ROW and e["source_sha256"]}
+    with open(sources_path(log_file), "w", encoding="utf-8") as f:
+        for sha, version in sorted(sources):
+            f.write(f"{sha} {version}\n")
+    return sources
+
+def logged_sources(log_file=EVENT_LOG_FILE):
+    """(source_sha256, parser_version) pairs that already have row events"""
+    if not os.path.exists(sources_path(log_file)):
+        return rebuild_sources(log_file)
+    with open(sources_path(log_file), "r", encoding="utf-8") as f:
+        return {tuple(line.split()) for line in f if line.strip()}
+
+def record_rows(rows, source, source_sha256, parser_version, log_file=EVENT_LOG_FILE):
+    """Append one row event per extracted (date, product, price) row"""
+    if source_sha256 and not os.path.exists(sources_path(log_file)):
+        rebuild_sources(log_file)
+    recorded_at = datetime.now().isoformat(timespec="seconds")
+    append_events(({
+        "type": ROW,
+        "date": date,
+        "product": product,
+        "price": price,
+        "source": source,
+        "source_sha256": source_sha256,
+        "parser_version": parser_version,
+        "recorded_at": recorded_at,
+    } for date, product, price in rows), log_file)
+    if source_sha256:
+        with open(sources_path(log_file), "a", encoding="utf-8") as f:
+            f.write(f"{source_sha256} {parser_version}\n")
+
+def record_correction(date, product, price=None, reason="", log_file=EVENT_LOG_FILE):
+    """Append a correction; price None deletes the (date, product) row"""
+    append_events([{
+        "type": CORRECTION,
+        "date": date,
+        "product": product,
+        "price": price,
+        "reason": reason,
+        "recorded_at": datetime.now().isoformat(timespec="seconds"),
+    }], log_file)
+
+def replay(log_file=EVENT_LOG_FILE):
+    """Fold the log into {product: {date: price}}
+
+    Each row event or correction overrides the earlier ones for its
+    (product, date); a correction without a price deletes the row.
+    """
+    series = {}
+    for event in read_events(log_file):
+        prices = series.setdefault(event["product"], {})
+        if event["price"] is None:
+            prices.pop(event["date"], None)
+        else:
+            prices[event["date"]] = event["price"]
+    return series
+
+def materialize(log_file=EVENT_LOG_FILE, csv_dir=CSV_DIR):
+    """Rebuild every per-product CSV and the matrix from the event log"""
+    series = replay(log_file)
+    if not series:
+        print(f"❌ No events in {log_file}, nothing to materialize")
+        return False
+
+    results = {}
+    for product_name, prices in series.items():
+        filename = CATALOG.resolve(product_name).csv_filename
+        rows = [(date, product_name, prices[date]) for date in sorted(prices)]
+        results[filename] = write_csv_if_changed(os.path.join(csv_dir, filename), rows)
+
+    print_change_summary(results)
+    build_matrix(csv_dir)
+    return True
+
+def import_csvs(csv_dir=CSV_DIR, log_file=EVENT_LOG_FILE):
+    """Seed the log with the rows already in the per-product CSVs"""
+    for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+        if os.path.basename(path) == MATRIX_FILE:
+            continue
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            rows = [(date, product, int(price)) for date, product, price in reader]
+        record_rows(rows, path, None, "csv-import", log_file)
+        print(f"   📥 Imported {len(rows)} rows from {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Extraction event log')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('materialize', help='Rebuild the CSVs from the log')
+    commands.add_parser('import-csv', help='Seed the log from the existing CSVs')
+    correct = commands.add_parser('correct', help='Append a correction')
+    correct.add_argument('date', help='YYYY-MM-DD')
+    correct.add_argument('product', help='Product name, alias or catalog ID')
+    correct.add_argument('price', nargs='?', type=int, help='Corrected price; omit with --delete')
+    correct.add_argument('--delete', action='store_true', help='Remove the row instead')
+    correct.add_argument('--reason', default='')
+    args = parser.parse_args()
+
+    if args.command == 'materialize':
+        return 0 if materialize() else 1
+    if args.command == 'import-csv':
+        import_csvs()
+        return 0
+
+    product = CATALOG.by_id.get(args.product) or CATALOG.resolve(args.product)
+    if product is None:
+        parser.error(f"Unknown product: {args.product}")
+    if (args.price is None) != args.delete:
+        parser.error("Give either a price or --delete")
+    record_correction(args.date, product.name, args.price, args.reason)
+    print(f"✅ Recorded correction for {product.id} on {args.date}")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,197 @@
+"""
+Local simulator of the Hindalco circular endpoint for downloader load tests
+Serves /Upload/PDF/primary-ready-reckoner-{d}-{month}-{yyyy}.pdf with a
+configurable mix of faults: added latency, 404 gaps, 5xx bursts, slow
+trickle bodies, wrong content types and non-PDF payloads.
+
+The fault for each path is picked deterministically from the seed, so a
+harness can ask the simulator which outcome a correct downloader should
+produce for every date.
+"""
+
+import re
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import MAX_RETRIES
+
+PATH_PATTERN = re.compile(r"^/Upload/PDF/primary-ready-reckoner-(\d{2})-([a-z]+)-(\d{4})\.pdf$")
+URL_TEMPLATE = "http://{host}:{port}/Upload/PDF/primary-ready-reckoner-{{}}-{{}}-{{}}.pdf"
+
+OK = "ok"
+MISSING = "missing"          # 404, no circular for this date
+BURST = "burst"              # burst_length 5xx responses, then the PDF
+TRICKLE = "trickle"          # PDF sent in small chunks with a delay between them
+WRONG_TYPE = "wrong_type"    # PDF bytes served as text/html
+NOT_PDF = "not_pdf"          # application/pdf header but an HTML error page body
+
+FAULT_KINDS = [OK, MISSING, BURST, TRICKLE, WRONG_TYPE, NOT_PDF]
+
+class FaultMix:
+    """Relative weights of each fault kind plus the knobs that shape them"""
+
+    def __init__(self, weights=None, latency=0.0, jitter=0.0, burst_length=2,
+                 trickle_chunk=1024, trickle_delay=0.01, payload_size=20000, seed=0):
+        self.weights = weights or {OK: 1.0}
+        unknown = set(self.weights) - set(FAULT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown fault kinds: {', '.join(sorted(unknown))}")
+        self.latency = latency
+        self.jitter = jitter
+        self.burst_length = burst_length
+        self.trickle_chunk = trickle_chunk
+        self.trickle_delay = trickle_delay
+        self.payload_size = payload_size
+        self.seed = seed
+
+    @classmethod
+    def parse(cls, spec, **kwargs):
+        """Build a mix from 'kind=weight,...', e.g. 'ok=6,missing=2,burst=1'"""
+        weights = {}
+        for item in filter(None, spec.split(",")):
+            kind, _, weight = item.partition("=")
+            weights[kind.strip()] = float(weight or 1)
+        return cls(weights, **kwargs)
+
+    def fault_for(self, path):
+        """Deterministic fault kind for a path"""
+        digest = hashlib.sha256(f"{self.seed}:{path}".encode()).digest()
+        point = int.from_bytes(digest[:8], "big") / 2 ** 64 * sum(self.weights.values())
+        for kind in FAULT_KINDS:
+            point -= self.weights.get(kind, 0)
+            if point < 0:
+                return kind
+        return OK
+
+    def expected_success(self, path, max_retries=MAX_RETRIES):
+        """Whether a correct downloader should end up with the PDF for this path"""
+        kind = self.fault_for(path)
+        if kind == BURST:
+            return self.burst_length < max_retries
+        return kind in (OK, TRICKLE)
+
+def make_payload(path, size):
+    """A small valid-looking PDF whose bytes are unique to the path"""
+    header = f"%PDF-1.4\n% Simulated Hindalco circular {path}\n".encode()
+    trailer = b"\n%%EOF\n"
+    filler = hashlib.sha256(path.encode()).hexdigest().encode()
+    body_size = max(size - len(header) - len(trailer), 0)
+    body = (filler * (body_size // len(filler) + 1))[:body_size]
+    return header + body + trailer
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        sim = self.server
+        mix = sim.mix
+        if mix.latency or mix.jitter:
+            time.sleep(mix.latency + random.uniform(0, mix.jitter))
+
+        if not PATH_PATTERN.match(self.path):
+            return self.send_body(404, "text/html", b"<html>Not Found</html>")
+
+        kind = mix.fault_for(self.path)
+        sim.count_request(kind)
+        payload = make_payload(self.path, mix.payload_size)
+
+        if kind == MISSING:
+            self.send_body(404, "text/html", b"<html>Not Found</html>")
+        elif kind == BURST and sim.next_attempt(self.path) <= mix.burst_length:
+            self.send_body(503, "text/html", b"<html>Service Unavailable</html>")
+        elif kind == WRONG_TYPE:
+            self.send_body(200, "text/html", payload)
+        elif kind == NOT_PDF:
+            self.send_body(200, "application/pdf", b"<html><body>Error generating document</body></html>")
+        elif kind == TRICKLE:
+            self.send_body(200, "application/pdf", payload, chunk=mix.trickle_chunk, delay=mix.trickle_delay)
+        else:
+            self.send_body(200, "application/pdf", payload)
+
+    def send_body(self, status, content_type, body, chunk=None, delay=0.0):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            if chunk is None:
+                self.wfile.write(body)
+                return
+            for start in range(0, len(body), chunk):
+                self.wfile.write(body[start:start + chunk])
+                self.wfile.flush()
+                time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class HindalcoSimulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, mix, host="127.0.0.1", port=0):
+        super().__init__((host, port), SimulatorHandler)
+        self.mix = mix
+        self.lock = threading.Lock()
+        self.attempts = {}
+        self.requests_by_kind = {}
+
+    def handle_error(self, request, client_address):
+        # Clients drop connections mid-response when they reject a fault; that is expected
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return URL_TEMPLATE.format(host=host, port=port)
+
+    def next_attempt(self, path):
+        with self.lock:
+            self.attempts[path] = self.attempts.get(path, 0) + 1
+            return self.attempts[path]
+
+    def count_request(self, kind):
+        with self.lock:
+            self.requests_by_kind[kind] = self.requests_by_kind.get(kind, 0) + 1
+
+    def reset(self, mix=None):
+        """Forget burst state and counters, optionally switching to a new mix"""
+        with self.lock:
+            if mix is not None:
+                self.mix = mix
+            self.attempts.clear()
+            self.requests_by_kind.clear()
+
+    def start_in_thread(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Hindalco endpoint simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--mix', default='ok=1', help="Fault weights, e.g. 'ok=6,missing=2,burst=1,trickle=1'")
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra latency, up to this many seconds')
+    parser.add_argument('--burst-length', type=int, default=2, help='5xx responses before a burst path succeeds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    mix = FaultMix.parse(args.mix, latency=args.latency, jitter=args.jitter,
+                         burst_length=args.burst_length, seed=args.seed)
+    server = HindalcoSimulator(mix, args.host, args.port)
+    print(f"🧪 Simulating {server.base_url.format('dd', 'month', 'yyyy')}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Simulator stopped")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Load test harness for HindalcoPDFDownloader
+Runs the downloader against the local endpoint simulator across
+concurrency levels and fault mixes, and reports throughput, tail latency
+and correctness (did each date end up downloaded exactly when it should).
+"""
+
+import os
+import time
+import logging
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from downloader import HindalcoPDFDownloader
+from hindalco_simulator import HindalcoSimulator, FaultMix, make_payload
+
+# Named fault mixes (kind weights) used when --mix is not given
+FAULT_MIXES = {
+    "clean": "ok=1",
+    "gaps": "ok=7,missing=3",
+    "flaky": "ok=6,burst=3,missing=1",
+    "hostile": "ok=4,missing=1,burst=1,trickle=2,wrong_type=1,not_pdf=1",
+}
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+def check_download(downloader, date, success, mix):
+    """Compare one download result with what the simulator says should happen"""
+    path = urlsplit(downloader.construct_url(date)).path
+    filepath = os.path.join(downloader.create_directory_structure(date), downloader.construct_filename(date))
+    if mix.expected_success(path):
+        if not (success and os.path.exists(filepath)):
+            return False
+        with open(filepath, "rb") as f:
+            return f.read() == make_payload(path, mix.payload_size)
+    return not success and not os.path.exists(filepath)
+
+def run_level(server, mix, concurrency, dates, retry_delay):
+    """Download all dates with the given concurrency and collect metrics"""
+    server.reset(mix)
+    local = threading.local()
+
+    with tempfile.TemporaryDirectory() as download_root:
+        def worker(date):
+            # requests.Session is not thread-safe, so each worker thread gets its own
+            if not hasattr(local, "downloader"):
+                local.downloader = HindalcoPDFDownloader(
+                    base_url=server.base_url, download_root=download_root, retry_delay=retry_delay)
+            started = time.perf_counter()
+            success = local.downloader.download_for_date(date)
+            elapsed = time.perf_counter() - started
+            return elapsed, check_download(local.downloader, date, success, mix)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(worker, dates))
+        wall = time.perf_counter() - started
+
+    latencies = [elapsed for elapsed, correct in results]
+    return {
+        "requests": len(dates),
+        "throughput": len(dates) / wall if wall else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": max(latencies) if latencies else 0.0,
+        "correct": sum(1 for elapsed, correct in results if correct),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the downloader against the local simulator')
+    parser.add_argument('--days', type=int, default=60, help='Number of consecutive dates to download per run')
+    parser.add_argument('--concurrency', default='1,4,16', help='Comma-separated worker counts')
+    parser.add_argument('--mix', action='append', help="Fault mix 'kind=weight,...' (repeatable); defaults to the named presets")
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds added to every simulated response')
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--burst-length', type=int, default=2)
+    parser.add_argument('--retry-delay', type=float, default=0.05, help='Downloader retry delay during the test')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Per-attempt download logs (including expected fault warnings) would swamp the output and the log file
+    logging.getLogger("downloader").setLevel(logging.CRITICAL)
+
+    mixes = {spec: spec for spec in args.mix} if args.mix else FAULT_MIXES
+    levels = [int(level) for level in args.concurrency.split(",")]
+    start = datetime(2025, 1, 1)
+    dates = [start + timedelta(days=i) for i in range(args.days)]
+
+    server = HindalcoSimulator(FaultMix())
+    server.start_in_thread()
+    print(f"🧪 Simulator at {server.base_url.format('dd', 'month', 'yyyy')}")
+
+    failures = 0
+    print(f"\n{'mix':<10} {'conc':>4} {'req':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'correct':>9}")
+    try:
+        for name, spec in mixes.items():
+            mix = FaultMix.parse(spec, latency=args.latency, jitter=args.jitter,
+                                 burst_length=args.burst_length, seed=args.seed)
+            for level in levels:
+                m = run_level(server, mix, level, dates, args.retry_delay)
+                failures += m["requests"] - m["correct"]
+                print(f"{name[:10]:<10} {level:>4} {m['requests']:>5} {m['throughput']:>8.1f} "
+                      f"{m['p50'] * 1000:>8.1f} {m['p95'] * 1000:>8.1f} {m['p99'] * 1000:>8.1f} "
+                      f"{m['max'] * 1000:>8.1f} {m['correct']:>4}/{m['requests']:<4}")
+    finally:
+        server.shutdown()
+
+    if failures:
+        print(f"\n❌ {failures} incorrect download outcomes")
+        return 1
+    print("\n✅ All download outcomes correct")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+Logging setup shared by all entry points
+Records are handed to a queue and written by a background listener thread,
+so logging never blocks on file I/O. The log file rotates by size or time
+and can optionally be written as JSON lines. Jobs started by the scheduler
+only log to the console; the scheduler captures that output and is the
+single writer of the log file, since rotation is not safe across processes.
+"""
+
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from config import (LOG_FILE, LOG_FORMAT, LOG_DATE_FORMAT, LOG_LEVEL, LOG_ROTATION,
+                    LOG_MAX_BYTES, LOG_ROTATE_WHEN, LOG_BACKUP_COUNT, LOG_JSON, LOG_TO_FILE,
+                    LOG_JOB_FORMAT)
+
+_listener = None
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each record as one JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, LOG_DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+def create_file_handler():
+    if LOG_ROTATION == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            LOG_FILE, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+
+    if LOG_JSON:
+        handler.setFormatter(JsonLinesFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+    return handler
+
+def log_level(name):
+    """Numeric level for a level name such as "INFO"; raises ValueError for unknown names"""
+    level = logging.getLevelName(name)
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level {name!r}; use DEBUG, INFO, WARNING, ERROR or CRITICAL")
+    return level
+
+def setup_logging():
+    """Configure the root logger once; later calls are no-ops"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT if LOG_TO_FILE else LOG_JOB_FORMAT,
+                                                  datefmt=LOG_DATE_FORMAT))
+    handlers = [create_file_handler(), stream_handler] if LOG_TO_FILE else [stream_handler]
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(log_level(LOG_LEVEL))
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _listener.start()
+    atexit.register(_listener.stop)
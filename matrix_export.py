@@ -0,0 +1,177 @@
+"""
+Wide-format (date x product) price matrix export
+Pivots all per-product CSVs onto one date axis in csv/matrix.csv and keeps it
+up to date incrementally: new dates are appended without re-reading the
+full history. An optional fixed-width binary twin (matrix.bin) holds the
+same rows for fast loading.
+"""
+
+import os
+import io
+import csv
+import glob
+import struct
+from csv_store import write_if_changed
+
+CSV_DIR = "csv"
+MATRIX_FILE = "matrix.csv"
+MATRIX_BINARY_FILE = "matrix.bin"
+MATRIX_BINARY = False  # also maintain matrix.bin next to matrix.csv
+
+MISSING_PRICE = 0  # stored in matrix.bin where a product has no price for a date
+
+def matrix_path(csv_dir=CSV_DIR):
+    return os.path.join(csv_dir, MATRIX_FILE)
+
+def binary_path(csv_dir=CSV_DIR):
+    return os.path.join(csv_dir, MATRIX_BINARY_FILE)
+
+def load_product_series(csv_dir=CSV_DIR):
+    """Read every per-product CSV into {product: {date: price}}"""
+    series = {}
+    for path in sorted(glob.glob(os.path.join(csv_dir, "*.csv"))):
+        if os.path.basename(path) == MATRIX_FILE:
+            continue
+        with open(path, "r", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) < 3:
+                    continue
+                date, product, price = row[0], row[1], row[2]
+                series.setdefault(product, {})[date] = int(price)
+    return series
+
+def render_row(date, products, prices):
+    buffer = io.StringIO(newline="")
+    csv.writer(buffer).writerow([date] + [prices.get(p, "") for p in products])
+    return buffer.getvalue().encode("utf-8")
+
+def record_struct(products):
+    return struct.Struct(f"<I{len(products)}i")
+
+def pack_record(date, products, prices):
+    """Binary record: date as YYYYMMDD followed by one int32 price per product"""
+    values = [prices.get(p, MISSING_PRICE) for p in products]
+    return record_struct(products).pack(int(date.replace("-", "")), *values)
+
+def build_matrix(csv_dir=CSV_DIR, binary=MATRIX_BINARY):
+    """Full rebuild of the matrix from the per-product CSVs; returns the write status"""
+    series = load_product_series(csv_dir)
+    products = sorted(series)
+    dates = sorted({date for prices in series.values() for date in prices})
+
+    buffer = io.StringIO(newline="")
+    writer = csv.writer(buffer)
+    writer.writerow(["Date"] + products)
+    for date in dates:
+        writer.writerow([date] + [series[p].get(date, "") for p in products])
+    status = write_if_changed(matrix_path(csv_dir), buffer.getvalue().encode("utf-8"))
+
+    if binary:
+        data = b"".join(pack_record(date, products, {p: series[p].get(date) for p in products if date in series[p]})
+                        for date in dates)
+        write_if_changed(binary_path(csv_dir), data)
+
+    print(f"   🧮 Matrix {status}: {len(dates)} dates x {len(products)} products")
+    return status
+
+def read_header(path):
+    with open(path, "r", newline="") as f:
+        return next(csv.reader(f), [])
+
+def read_last_line(path, block_size=4096):
+    """Return (offset, text) of the last line without reading the whole file"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        end = f.tell()
+        pos = end
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            # Need a newline before the final line's own terminator
+            if tail.rstrip(b"\r\n").rfind(b"\n") != -1:
+                break
+    body = tail.rstrip(b"\r\n")
+    start = body.rfind(b"\n") + 1
+    return pos + start, body[start:].decode("utf-8")
+
+def append_to_matrix(rows, csv_dir=CSV_DIR, binary=MATRIX_BINARY):
+    """Add extracted (date, product, price) rows to the matrix incrementally
+
+    Dates after the last matrix row are appended and the last row is merged
+    in place. Older dates or new products fall back to a full rebuild from
+    the per-product CSVs.
+    """
+    path = matrix_path(csv_dir)
+    if not os.path.exists(path) or (binary and not os.path.exists(binary_path(csv_dir))):
+        return build_matrix(csv_dir, binary)
+
+    products = read_header(path)[1:]
+    by_date = {}
+    for date, product, price in rows:
+        by_date.setdefault(date, {})[product] = price
+
+    if any(product not in products for prices in by_date.values() for product in prices):
+        print("   🧮 New product column, rebuilding matrix")
+        return build_matrix(csv_dir, binary)
+
+    last_offset, last_line = read_last_line(path)
+    last_row = next(csv.reader([last_line]))
+    last_date = last_row[0] if last_row and last_row[0] != "Date" else ""
+
+    if any(date < last_date for date in by_date):
+        print("   🧮 Back-dated rows, rebuilding matrix")
+        return build_matrix(csv_dir, binary)
+
+    record = record_struct(products)
+    with open(path, "r+b") as f:
+        bin_file = open(binary_path(csv_dir), "r+b") if binary else None
+        try:
+            for date in sorted(by_date):
+                prices = by_date[date]
+                if date == last_date:
+                    # Prices already in the matrix win, as in the per-product CSVs
+                    existing = {p: int(v) for p, v in zip(products, last_row[1:]) if v}
+                    prices = {**prices, **existing}
+                    f.seek(last_offset)
+                    f.truncate()
+                    if bin_file:
+                        bin_file.seek(-record.size, os.SEEK_END)
+                        bin_file.truncate()
+                else:
+                    f.seek(0, os.SEEK_END)
+                    last_offset = f.tell()
+                    last_date = date
+                    if bin_file:
+                        bin_file.seek(0, os.SEEK_END)
+
+                f.write(render_row(date, products, prices))
+                if bin_file:
+                    bin_file.write(pack_record(date, products, prices))
+                last_row = [date] + [str(prices.get(p, "")) for p in products]
+        finally:
+            if bin_file:
+                bin_file.close()
+
+    print(f"   🧮 Matrix updated for {', '.join(sorted(by_date))}")
+    return "updated"
+
+def load_matrix_binary(csv_dir=CSV_DIR):
+    """Load matrix.bin as (products, [(date, [prices])]) using the column order of matrix.csv"""
+    products = read_header(matrix_path(csv_dir))[1:]
+    record = record_struct(products)
+    with open(binary_path(csv_dir), "rb") as f:
+        data = f.read()
+    matrix = []
+    for values in record.iter_unpack(data):
+        date = str(values[0])
+        matrix.append((f"{date[:4]}-{date[4:6]}-{date[6:]}", list(values[1:])))
+    return products, matrix
+
+if __name__ == "__main__":
+    print("🚀 Rebuilding price matrix...")
+    build_matrix()
@@ -1,14 +1,20 @@
 import os
-import csv
+import io
+import logging
 from datetime import datetime
 from PyPDF2 import PdfReader
 import glob
+from csv_store import write_csv_if_changed, print_change_summary, file_hash, content_hash, UNCHANGED
+from matrix_export import build_matrix
+from validation import validate_sources, validate_history, quarantine_rows
+from catalog import canonicalize_rows, csv_filename
+from archive import ArchiveReader, archived_pdfs
+from event_log import record_rows, record_correction, logged_sources, replay
 
 CSV_DIR = "csv"
+PARSER_VERSION = "bulk-1"
 
-def sanitize_filename(text):
-    """Clean filename for CSV creation"""
-    return text.replace("/", "-").replace("\"", "").replace(",", "").replace(":", "").replace(" ", "_").replace("%", "percent")
+logger = logging.getLogger(__name__)
 
 def extract_date_from_text(text):
     """Extract date from PDF text with multiple patterns"""
@@ -116,10 +122,14 @@ def clean_description(desc):
     
     return desc
 
-def extract_table_data(pdf_path):
-    """Extract data from PDF with improved parsing and duplicate prevention"""
+def extract_table_data(pdf_path, data=None):
+    """Extract data from PDF with improved parsing and duplicate prevention
+    
+    If data (the PDF bytes, e.g. a member read from an archive) is given,
+    it is parsed from memory and pdf_path is only used for its filename.
+    """
     try:
-        reader = PdfReader(pdf_path)
+        reader = PdfReader(io.BytesIO(data) if data is not None else pdf_path)
         text = "\n".join([page.extract_text() for page in reader.pages])
         lines = text.splitlines()
         
@@ -193,7 +203,7 @@ def extract_table_data(pdf_path):
                                                 seen_items.add(unique_key)
                                                 data_rows.append((current_date, desc, price))
                                                 price_found = True
-                                                print(f"   ✅ Item {item_number}: {desc} → ₹{price:,}")
+                                                logger.debug("Item %s: %s → ₹%s", item_number, desc, price)
                                                 break
                                 except (ValueError, IndexError):
                                     continue
@@ -212,7 +222,7 @@ def extract_table_data(pdf_path):
                                     if len(desc) > 5 and unique_key not in seen_items:
                                         seen_items.add(unique_key)
                                         data_rows.append((current_date, desc, price))
-                                        print(f"   ✅ Item {item_number} (next line): {desc} → ₹{price:,}")
+                                        logger.debug("Item %s (next line): %s → ₹%s", item_number, desc, price)
                                         
                         except Exception as e:
                             continue
@@ -225,10 +235,13 @@ def extract_table_data(pdf_path):
         return []
 
 def create_csv_file(product_name, data_points):
-    """Create or update CSV file for a product with duplicate removal"""
-    filename = sanitize_filename(product_name) + ".csv"
+    """Create or update CSV file for a product with duplicate removal
+
+    The file is only rewritten when its content changed; returns the
+    write status ("created", "updated" or "unchanged")
+    """
+    filename = csv_filename(product_name)
     csv_path = os.path.join(CSV_DIR, filename)
-    os.makedirs(CSV_DIR, exist_ok=True)
     
     # Remove duplicates based on date and price
     unique_data = {}
@@ -241,14 +254,14 @@ def create_csv_file(product_name, data_points):
     final_data = list(unique_data.values())
     final_data.sort(key=lambda x: x[0])
     
-    # Write CSV with headers
-    with open(csv_path, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Date", "Product", "Price"])
-        for date, desc, price in final_data:
-            writer.writerow([date, desc, price])
+    status = write_csv_if_changed(csv_path, final_data)
     
-    print(f"   💾 Created: {filename} with {len(final_data)} unique data points")
+    if status == UNCHANGED:
+        print(f"   ⏭️ Unchanged: {filename} ({len(final_data)} data points)")
+    else:
+        print(f"   💾 {status.capitalize()}: {filename} with {len(final_data)} unique data points")
+    
+    return filename, status
 
 def process_all_pdfs():
     """Process all PDF files and create consolidated CSV files"""
@@ -260,13 +273,16 @@ def process_all_pdfs():
         "*.pdf"
     ]
     
-    all_pdfs = []
+    all_pdfs = set()
     for pattern in pdf_patterns:
-        all_pdfs.extend(glob.glob(pattern, recursive=True))
+        all_pdfs.update(glob.glob(pattern, recursive=True))
+    
+    # Circulars packed into year archives keep their old loose paths as names
+    all_pdfs.update(archived_pdfs())
     
     # Filter for Hindalco-related PDFs
     hindalco_pdfs = []
-    for pdf in all_pdfs:
+    for pdf in sorted(all_pdfs):
         filename = os.path.basename(pdf).lower()
         if any(keyword in filename for keyword in ['hindalco', 'primary-ready-reckoner', 'circular']):
             hindalco_pdfs.append(pdf)
@@ -279,28 +295,78 @@ def process_all_pdfs():
         print("❌ No Hindalco PDF files found!")
         return
     
-    # Dictionary to collect data by product
+    # (pdf_path, row) pairs, so source-level checks can tell circulars apart
+    extracted = []
+    rows_by_pdf = {}
+    
+    # Process each PDF, reading archived ones straight out of the mmap'd archive
+    with ArchiveReader() as archive:
+        for pdf_path in hindalco_pdfs:
+            print(f"\n🔄 Processing: {pdf_path}")
+            data = archive.read(pdf_path) if pdf_path in archive else None
+            source_sha256 = content_hash(data) if data is not None else file_hash(pdf_path)
+            extracted_rows, unknown_rows = canonicalize_rows(extract_table_data(pdf_path, data=data))
+            if unknown_rows:
+                quarantine_rows(unknown_rows, pdf_path, source_sha256)
+            
+            rows_by_pdf[pdf_path] = (source_sha256, extracted_rows)
+            extracted.extend((pdf_path, row) for row in extracted_rows)
+    
+    # Quarantine rows dated away from their circular and conflicting duplicate dates
+    accepted, flagged_by_source = validate_sources(extracted)
+    for pdf_path in sorted({source for source, row, reasons in flagged_by_source}):
+        quarantine_rows([(row, reasons) for source, row, reasons in flagged_by_source if source == pdf_path],
+                        pdf_path, rows_by_pdf[pdf_path][0])
+    
+    # Quarantine outliers found walking each product's full history
+    series = {}
+    for pdf_path, (date, product, price) in accepted:
+        series.setdefault(product, {})[date] = price
+    flagged = validate_history(series)
+    if flagged:
+        quarantine_rows(flagged, "bulk extraction")
+    flagged_rows = {row for row, reasons in flagged}
+    accepted = [(pdf_path, row) for pdf_path, row in accepted if row not in flagged_rows]
+    flagged += [(row, reasons) for source, row, reasons in flagged_by_source]
+    
     product_data = {}
+    for pdf_path, row in accepted:
+        product_data.setdefault(row[1], []).append(row)
+    accepted_by_pdf = {}
+    for pdf_path, row in accepted:
+        accepted_by_pdf.setdefault(pdf_path, []).append(row)
     
-    # Process each PDF
-    for pdf_path in hindalco_pdfs:
-        print(f"\n🔄 Processing: {pdf_path}")
-        extracted_rows = extract_table_data(pdf_path)
-        
-        for date, desc, price in extracted_rows:
-            if desc not in product_data:
-                product_data[desc] = []
-            product_data[desc].append((date, desc, price))
+    # Record accepted rows in the event log, once per PDF content and parser version
+    already_logged = logged_sources()
+    for pdf_path, (source_sha256, rows) in rows_by_pdf.items():
+        if rows and (source_sha256, PARSER_VERSION) not in already_logged:
+            record_rows(accepted_by_pdf.get(pdf_path, []), pdf_path, source_sha256, PARSER_VERSION)
+            already_logged.add((source_sha256, PARSER_VERSION))
+    
+    # Outliers may already be in the log (e.g. from the CSV import seed); delete them there too
+    logged = replay()
+    for (date, product, price), reasons in flagged:
+        if logged.get(product, {}).get(date) == price:
+            record_correction(date, product, None, "bulk validation: " + "; ".join(reasons))
+            logged[product].pop(date)
     
     # Create CSV files for each product
     print(f"\n📊 Creating CSV files for {len(product_data)} products:")
+    results = {}
     for product_name, data_points in product_data.items():
-        create_csv_file(product_name, data_points)
+        filename, status = create_csv_file(product_name, data_points)
+        results[filename] = status
+    
+    print_change_summary(results)
+    build_matrix()
     
     print(f"\n✅ Bulk extraction completed!")
     print(f"📁 CSV files created in: {CSV_DIR}")
     print(f"📈 Total products: {len(product_data)}")
 
 if __name__ == "__main__":
+    from log_setup import setup_logging
+    setup_logging()
+    
     print("🚀 Starting bulk PDF to CSV extraction...")
     process_all_pdfs()
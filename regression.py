@@ -0,0 +1,242 @@
+"""
+Golden-corpus regression and performance gate for the extractors
+Runs both extract_table_data implementations over every PDF in Downloads/,
+loose or archived, compares their rows with the checked-in golden set
+(derived from csv/) and records per-PDF parse time and peak memory.
+Fails when accuracy drops below the baseline or throughput regresses past
+the allowed percentage.
+
+Each PDF is timed TIMING_REPEATS times and its fastest run counts. Machine
+speed drifts too much between runs for absolute PDFs/s to be compared, so
+throughput is only gated with --base-dir: the base commit's extractors
+(e.g. a git worktree) are timed on the same PDFs, alternating with the
+current ones, and the current code may not be more than the allowed
+percentage slower. golden/baseline.json gates accuracy.
+"""
+
+import io
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import tracemalloc
+import importlib
+import contextlib
+from datetime import datetime
+from catalog import CATALOG
+from matrix_export import load_product_series
+from archive import ArchiveReader, loose_pdfs, archived_pdfs
+
+GOLDEN_DIR = "golden"
+GOLDEN_FILE = os.path.join(GOLDEN_DIR, "golden_rows.csv")
+BASELINE_FILE = os.path.join(GOLDEN_DIR, "baseline.json")
+
+MAX_THROUGHPUT_REGRESSION_PCT = 20.0  # allowed drop in PDFs/second against the base commit
+TIMING_REPEATS = 3                    # timed runs per PDF; the fastest one counts
+ACCURACY_TOLERANCE = 0.0              # allowed drop in precision/recall against the baseline
+
+EXTRACTOR_MODULES = ["csv_from_pdf", "one_time_bulk_extractor"]
+
+def load_extractors(root=None):
+    """{name: extract_table_data}, from this tree or from another checkout at root
+
+    A checkout's modules are imported against its own sibling modules, then
+    sys.modules is restored so the current tree's modules stay in place.
+    """
+    if root is None:
+        return {name: importlib.import_module(name).extract_table_data for name in EXTRACTOR_MODULES}
+
+    root = os.path.abspath(root)
+    local = [name[:-3] for name in os.listdir(root) if name.endswith(".py")]
+    saved = {name: sys.modules.pop(name) for name in local if name in sys.modules}
+    sys.path.insert(0, root)
+    try:
+        return {name: importlib.import_module(name).extract_table_data for name in EXTRACTOR_MODULES}
+    finally:
+        sys.path.remove(root)
+        for name in local:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+def find_pdfs():
+    """Loose and archived circulars, archived ones under their former loose paths"""
+    return sorted(set(loose_pdfs()) | set(archived_pdfs()))
+
+def update_golden():
+    """Regenerate the golden set from the current per-product CSVs"""
+    series = load_product_series()
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    rows = sorted((date, product, price) for product, prices in series.items() for date, price in prices.items())
+    with open(GOLDEN_FILE, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Date", "Product", "Price"])
+        writer.writerows(rows)
+    print(f"💾 Wrote {len(rows)} golden rows to {GOLDEN_FILE}")
+
+def load_golden():
+    """{(date, product): price} from the golden file"""
+    with open(GOLDEN_FILE, "r", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return {(date, product): int(price) for date, product, price in reader}
+
+def run_pdf(extract, pdf_path, data, measure_memory, repeats=TIMING_REPEATS, base_extract=None):
+    """Extract one PDF quietly
+
+    Returns (rows, seconds, base seconds or None, peak bytes or None), the
+    seconds being the fastest of repeats runs. The base extractor's runs
+    alternate with the current one's, so machine speed drift hits both.
+    """
+    extracts = [extract] if base_extract is None else [extract, base_extract]
+    fastest = [None] * len(extracts)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for repeat in range(repeats):
+            order = range(len(extracts)) if repeat % 2 == 0 else reversed(range(len(extracts)))
+            for i in order:
+                started = time.perf_counter()
+                result = extracts[i](pdf_path, data=data)
+                seconds = time.perf_counter() - started
+                fastest[i] = seconds if fastest[i] is None else min(fastest[i], seconds)
+                if i == 0:
+                    rows = result
+
+        peak = None
+        if measure_memory:
+            # Separate traced run: tracemalloc slows parsing and would skew the timing
+            tracemalloc.start()
+            extract(pdf_path, data=data)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return rows, fastest[0], fastest[1] if base_extract else None, peak
+
+def score(extracted, golden):
+    """Precision and recall of extracted rows on the dates the golden set covers"""
+    golden_dates = {date for date, product in golden}
+    found = {}
+    for date, desc, price in extracted:
+        if date not in golden_dates:
+            continue
+        product = CATALOG.resolve(desc)
+        found[(date, product.name if product else desc)] = price
+
+    correct = sum(1 for key, price in found.items() if golden.get(key) == price)
+    return {
+        "correct": correct,
+        "wrong": sum(1 for key, price in found.items() if key in golden and golden[key] != price),
+        "extra": sum(1 for key in found if key not in golden),
+        "missing": sum(1 for key in golden if key not in found),
+        "precision": correct / len(found) if found else 0.0,
+        "recall": correct / len(golden) if golden else 0.0,
+    }
+
+def run_extractor(name, extract, pdfs, golden, measure_memory, repeats=TIMING_REPEATS, base_extract=None):
+    per_pdf = []
+    extracted = []
+    base_total = 0.0
+    with ArchiveReader() as archive:
+        for pdf_path in pdfs:
+            data = archive.read(pdf_path) if pdf_path in archive else None
+            rows, elapsed, base_elapsed, peak = run_pdf(extract, pdf_path, data, measure_memory, repeats, base_extract)
+            extracted.extend(rows)
+            per_pdf.append({"pdf": pdf_path, "rows": len(rows), "seconds": round(elapsed, 4), "peak_bytes": peak})
+            base_total += base_elapsed or 0.0
+
+    total = sum(p["seconds"] for p in per_pdf)
+    result = score(extracted, golden)
+    result.update({
+        "pdfs": len(pdfs),
+        "seconds": round(total, 3),
+        "pdfs_per_second": round(len(pdfs) / total, 2) if total else 0.0,
+        "max_peak_bytes": max((p["peak_bytes"] or 0 for p in per_pdf), default=0),
+        "empty_pdfs": sum(1 for p in per_pdf if not p["rows"]),
+    })
+    if base_extract:
+        result["base_pdfs_per_second"] = round(len(pdfs) / base_total, 2) if base_total else 0.0
+    return result, per_pdf
+
+def compare(name, result, baseline, max_regression_pct):
+    """Failure messages for one extractor: accuracy against its baseline, throughput against the base commit"""
+    failures = []
+    if baseline:
+        for metric in ("precision", "recall"):
+            if result[metric] < baseline[metric] - ACCURACY_TOLERANCE:
+                failures.append(f"{name}: {metric} {result[metric]:.4f} < baseline {baseline[metric]:.4f}")
+    if "base_pdfs_per_second" not in result:
+        return failures
+    floor = result["base_pdfs_per_second"] * (1 - max_regression_pct / 100)
+    if result["pdfs_per_second"] < floor:
+        failures.append(f"{name}: throughput {result['pdfs_per_second']:.2f} PDFs/s is more than "
+                        f"{max_regression_pct:.0f}% below the base commit's {result['base_pdfs_per_second']:.2f}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Extraction regression and performance gate')
+    parser.add_argument('--update-golden', action='store_true', help='Regenerate the golden set from csv/ and exit')
+    parser.add_argument('--update-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--max-regression', type=float, default=MAX_THROUGHPUT_REGRESSION_PCT,
+                        help='Allowed throughput drop against the base commit, in percent')
+    parser.add_argument('--base-dir',
+                        help='Checkout of the base commit to time against; throughput is only gated with this')
+    parser.add_argument('--repeats', type=int, default=TIMING_REPEATS,
+                        help='Timed runs per PDF; the fastest one counts')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced peak-memory pass')
+    parser.add_argument('--report', help='Write per-PDF timings and memory to this JSON file')
+    args = parser.parse_args()
+
+    if args.update_golden:
+        update_golden()
+        return 0
+
+    golden = load_golden()
+    pdfs = find_pdfs()
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, "r") as f:
+            baselines = json.load(f)["extractors"]
+    base_extractors = {}
+    if args.base_dir:
+        try:
+            base_extractors = load_extractors(args.base_dir)
+        except (ImportError, AttributeError, OSError) as e:
+            print(f"⚠️ Could not load extractors from {args.base_dir} ({e}); throughput not gated")
+    print(f"🔍 {len(pdfs)} PDFs, {len(golden)} golden rows")
+
+    results, report, failures = {}, {}, []
+    for name, extract in load_extractors().items():
+        result, per_pdf = run_extractor(name, extract, pdfs, golden, not args.no_memory, args.repeats,
+                                        base_extractors.get(name))
+        results[name], report[name] = result, per_pdf
+        failures.extend(compare(name, result, baselines.get(name), args.max_regression))
+        base_note = f" (base {result['base_pdfs_per_second']:.2f})" if "base_pdfs_per_second" in result else ""
+        print(f"   📊 {name}: precision {result['precision']:.4f}, recall {result['recall']:.4f} "
+              f"({result['correct']} correct, {result['wrong']} wrong, {result['extra']} extra, "
+              f"{result['missing']} missing), {result['pdfs_per_second']:.2f} PDFs/s{base_note}, "
+              f"peak {result['max_peak_bytes'] / 1024:.0f} KiB, {result['empty_pdfs']} PDFs without rows")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump({"updated": datetime.now().isoformat(timespec="seconds"), "extractors": results},
+                      f, indent=2, sort_keys=True)
+        print(f"💾 Baseline written to {BASELINE_FILE}")
+        return 0
+
+    if not baselines:
+        print(f"⚠️ No baseline in {BASELINE_FILE}; run with --update-baseline to create one")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    if base_extractors:
+        print("✅ No accuracy or throughput regression")
+    else:
+        print("✅ No accuracy regression (throughput not gated without --base-dir)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
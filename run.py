@@ -3,32 +3,62 @@ Main entry point for Hindalco PDF Downloader
 Can be run manually or by automated systems
 """
 
+import os
 import sys
 import argparse
 from datetime import datetime, timedelta
 from downloader import HindalcoPDFDownloader
+from log_setup import setup_logging
 import logging
 
+logger = logging.getLogger(__name__)
+
+def download_and_extract(downloader, date):
+    """Download the circular for date and hand its bytes straight to the CSV extractor
+
+    The PDF is still saved under Downloads/, but parsing starts from the
+    in-memory buffer instead of re-reading the file from disk. Returns True
+    only if the PDF was downloaded (or already present) and updated the CSVs.
+    """
+    buffer = bytearray()
+    if not downloader.download_for_date(date, buffer=buffer):
+        return False
+
+    from csv_from_pdf import process_pdf
+    dir_path = downloader.create_directory_structure(date)
+    filepath = os.path.join(dir_path, downloader.construct_filename(date))
+    if not buffer:
+        # Already downloaded by an earlier run, so nothing was buffered
+        logger.info(f"Extracting from existing file {filepath}")
+        return process_pdf(filepath)
+    return process_pdf(filepath, data=buffer)
+
 def main():
     parser = argparse.ArgumentParser(description='Hindalco PDF Downloader')
     parser.add_argument('--date', type=str, help='Download for specific date (YYYY-MM-DD format)')
     parser.add_argument('--scheduler', action='store_true', help='Run in scheduler mode (continuous)')
     parser.add_argument('--backfill', type=int, help='Download missing files for last N days')
+    parser.add_argument('--run-for', type=int, help='In scheduler mode, stop after N minutes instead of running forever')
+    parser.add_argument('--extract', action='store_true', help='Update CSVs straight from the downloaded PDF (today or --date)')
     
     args = parser.parse_args()
+    setup_logging()
     
     downloader = HindalcoPDFDownloader()
     
     if args.scheduler:
         # Start the scheduler
         from scheduler import start_scheduler
-        start_scheduler()
+        start_scheduler(run_for=args.run_for * 60 if args.run_for else None)
     
     elif args.date:
         # Download for specific date
         try:
             target_date = datetime.strptime(args.date, '%Y-%m-%d')
-            success = downloader.download_for_date(target_date)
+            if args.extract:
+                success = download_and_extract(downloader, target_date)
+            else:
+                success = downloader.download_for_date(target_date)
             sys.exit(0 if success else 1)
         except ValueError:
             print("Error: Date must be in YYYY-MM-DD format")
@@ -48,6 +78,11 @@ def main():
         print(f"Backfill completed: {success_count}/{args.backfill} files downloaded")
         sys.exit(0)
     
+    elif args.extract:
+        # Download for today and update CSVs from memory
+        success = download_and_extract(downloader, datetime.now())
+        sys.exit(0 if success else 1)
+    
     else:
         # Default: download for today
         from downloader import main as download_main
@@ -1,56 +1,225 @@
 """
 Scheduler for Hindalco PDF Downloader
-Runs the downloader at specified time daily
+Runs the download, backup and CSV update jobs at their configured times daily
+
+Each job runs as its own subprocess with its own timeout, so a slow job
+never blocks jobs outside its group. Jobs sharing a group (they write the
+same files) run one at a time, in the order they fell due. The scheduler sleeps exactly until the next due
+job and persists last-run times, so runs missed while it was down are
+caught up on restart.
 """
 
-import schedule
-import time
+import os
+import re
+import sys
+import json
+import asyncio
 import logging
-from datetime import datetime
-from downloader import main as download_main
-from config import DOWNLOAD_TIME, LOG_FILE, LOG_FORMAT, LOG_DATE_FORMAT, LOG_LEVEL
-
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, LOG_LEVEL),
-    format=LOG_FORMAT,
-    datefmt=LOG_DATE_FORMAT,
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
+from datetime import datetime, timedelta
+from config import SCHEDULE_JOBS, SCHEDULER_STATE_FILE
+from log_setup import setup_logging, log_level
 
 logger = logging.getLogger(__name__)
 
-def scheduled_download():
-    """Wrapper function for scheduled download"""
-    logger.info("=" * 50)
-    logger.info("SCHEDULED DOWNLOAD STARTED")
-    logger.info("=" * 50)
-    
+# Jobs log to the console with LOG_JOB_FORMAT ("LEVEL - message"); lines
+# without a level prefix are plain print() output
+JOB_LINE = re.compile(r"^(DEBUG|INFO|WARNING|ERROR|CRITICAL) - (.*)$")
+
+class Job:
+    """A daily job run as a subprocess at one or more local times"""
+
+    def __init__(self, name, command, times, timeout, group=None):
+        self.name = name
+        self.command = command
+        self.times = sorted(datetime.strptime(t, "%H:%M").time() for t in times)
+        self.timeout = timeout
+        self.group = group
+
+    def previous_due(self, now):
+        """Most recent scheduled time at or before now"""
+        for days_back in range(2):
+            day = (now - timedelta(days=days_back)).date()
+            for t in reversed(self.times):
+                due = datetime.combine(day, t)
+                if due <= now:
+                    return due
+        return None
+
+    def next_due(self, now):
+        """First scheduled time strictly after now"""
+        for days_ahead in range(2):
+            day = (now + timedelta(days=days_ahead)).date()
+            for t in self.times:
+                due = datetime.combine(day, t)
+                if due > now:
+                    return due
+        return None
+
+def build_jobs(jobs_config=SCHEDULE_JOBS):
+    return [
+        Job(name, [sys.executable] + spec["command"], spec["times"], spec["timeout"], spec.get("group"))
+        for name, spec in jobs_config.items()
+    ]
+
+def load_state(state_file=SCHEDULER_STATE_FILE):
+    """Load persisted last-run times ({job name: {"last_run": iso, ...}})"""
+    if not os.path.exists(state_file):
+        return {}
     try:
-        download_main()
-    except Exception as e:
-        logger.error(f"Error during scheduled download: {str(e)}")
-    
-    logger.info("=" * 50)
-    logger.info("SCHEDULED DOWNLOAD COMPLETED")
-    logger.info("=" * 50)
+        with open(state_file, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read scheduler state {state_file}: {str(e)}")
+        return {}
+
+def save_state(state, state_file=SCHEDULER_STATE_FILE):
+    tmp_file = state_file + ".tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_file, state_file)
+
+def last_run(state, job):
+    entry = state.get(job.name)
+    if not entry:
+        return None
+    return datetime.fromisoformat(entry["last_run"])
+
+class Scheduler:
+    def __init__(self, jobs, state_file=SCHEDULER_STATE_FILE):
+        self.jobs = jobs
+        self.state_file = state_file
+        self.state = load_state(state_file)
+        self.running = {}
+        self.group_locks = {}
+
+    def missed_jobs(self, now):
+        """Jobs whose most recent slot passed without a recorded run, oldest slot first"""
+        missed = []
+        for job in self.jobs:
+            due = job.previous_due(now)
+            previous = last_run(self.state, job)
+            if due is not None and (previous is None or previous < due):
+                missed.append((due, job))
+        missed.sort(key=lambda item: item[0])
+        return [job for due, job in missed]
+
+    async def log_output(self, job, stream):
+        """Write a job's console output to the log, one record per line, keeping its level"""
+        async for line in stream:
+            text = line.decode("utf-8", errors="replace").rstrip()
+            match = JOB_LINE.match(text)
+            level, message = (log_level(match.group(1)), match.group(2)) if match else (logging.INFO, text)
+            logger.log(level, f"[{job.name}] {message}")
+
+    async def run_job(self, job):
+        """Run one job, first waiting for any running job of its group
+
+        asyncio.Lock wakes waiters first-in first-out, so jobs of a group
+        run in the order they were started.
+        """
+        if job.group is None:
+            await self.execute_job(job)
+            return
+        lock = self.group_locks.setdefault(job.group, asyncio.Lock())
+        if lock.locked():
+            logger.info(f"Job {job.name} waiting for the running {job.group} job")
+        async with lock:
+            await self.execute_job(job)
 
-def start_scheduler():
+    async def execute_job(self, job):
+        """Run one job as a subprocess, killing it if it exceeds its timeout"""
+        started = datetime.now()
+        logger.info("=" * 50)
+        logger.info(f"JOB {job.name.upper()} STARTED (timeout {job.timeout}s)")
+        logger.info("=" * 50)
+
+        status = "failed"
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *job.command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                env={**os.environ, "LOG_TO_FILE": "0", "PYTHONUNBUFFERED": "1"})
+            output = asyncio.create_task(self.log_output(job, process.stdout))
+            try:
+                returncode = await asyncio.wait_for(process.wait(), timeout=job.timeout)
+                await output
+                status = "ok" if returncode == 0 else f"exit {returncode}"
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                output.cancel()
+                status = "timeout"
+                logger.error(f"Job {job.name} timed out after {job.timeout}s and was killed")
+        except Exception as e:
+            logger.error(f"Error during job {job.name}: {str(e)}")
+
+        self.state[job.name] = {"last_run": started.isoformat(timespec="seconds"), "status": status}
+        save_state(self.state, self.state_file)
+
+        logger.info("=" * 50)
+        logger.info(f"JOB {job.name.upper()} COMPLETED ({status})")
+        logger.info("=" * 50)
+
+    def start_job(self, job):
+        """Start a job in the background unless a previous run is still going"""
+        if job.name in self.running:
+            logger.warning(f"Job {job.name} is still running, skipping this run")
+            return
+        task = asyncio.create_task(self.run_job(job))
+        self.running[job.name] = task
+        task.add_done_callback(lambda _: self.running.pop(job.name, None))
+
+    def catch_up(self, now):
+        """Start jobs missed while the scheduler was down, oldest slot first
+
+        They run in the background like any scheduled run, so a long catch-up
+        never holds back slots that fall due meanwhile. Jobs of one group
+        still run one after another in this order (download before csv_update).
+        """
+        for job in self.missed_jobs(now):
+            logger.info(f"Catching up missed run of {job.name}")
+            self.start_job(job)
+
+    async def run(self, run_for=None):
+        """Run until interrupted, or for run_for seconds if given"""
+        checked = datetime.now()
+        deadline = checked + timedelta(seconds=run_for) if run_for else None
+
+        self.catch_up(checked)
+
+        while True:
+            # Slots are taken from the last one handled, not from now, so a late
+            # wake-up still runs every slot that fell due in between
+            next_runs = [(job.next_due(checked), job) for job in self.jobs]
+            wake = min(due for due, job in next_runs)
+            if deadline and wake > deadline:
+                logger.info(f"No jobs due before {deadline.strftime('%H:%M:%S')}, stopping")
+                break
+
+            logger.info(f"Next run at {wake.strftime('%Y-%m-%d %H:%M')}: "
+                        f"{', '.join(job.name for due, job in next_runs if due == wake)}")
+            # Wall clock can drift from the loop's monotonic clock; re-check after waking
+            while datetime.now() < wake:
+                await asyncio.sleep((wake - datetime.now()).total_seconds())
+
+            for due, job in next_runs:
+                if due == wake:
+                    self.start_job(job)
+            checked = wake
+
+        if self.running:
+            await asyncio.gather(*self.running.values())
+
+def start_scheduler(run_for=None):
     """Start the scheduler"""
-    logger.info(f"Starting scheduler - will run daily at {DOWNLOAD_TIME}")
-    
-    # Schedule the job
-    schedule.every().day.at(DOWNLOAD_TIME).do(scheduled_download)
-    
+    setup_logging()
+    jobs = build_jobs()
+    for job in jobs:
+        logger.info(f"Job {job.name}: daily at {', '.join(t.strftime('%H:%M') for t in job.times)}")
+
     logger.info("Scheduler started. Press Ctrl+C to stop.")
-    
+
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        asyncio.run(Scheduler(jobs).run(run_for=run_for))
     except KeyboardInterrupt:
         logger.info("Scheduler stopped by user")
     except Exception as e:
@@ -0,0 +1,264 @@
+"""
+Data-quality validation for extracted price rows
+Checks each row against its product's recent history before it is written:
+- duplicate dates with a conflicting price, and out-of-order dates
+- z-score of the day-over-day log move against the recent moves
+- spread to the day's median price against the recent spread range
+- row date far from the date in the source PDF's filename (catches the
+  datetime.now() fallback when the w.e.f. date is not found)
+
+Failing rows are appended to quarantine/quarantine.csv instead of the CSVs.
+A real level shift (market move, grade premium change) fails the statistical
+checks on every circular, so quarantined rows newer than a product's history
+are released once CONFIRM_CIRCULARS consecutive circulars agree on the new
+level. Prices are held in per-product arrays, so checking the full history
+takes milliseconds.
+"""
+
+import os
+import csv
+import math
+import statistics
+from array import array
+from datetime import datetime
+from matrix_export import load_product_series, CSV_DIR
+
+QUARANTINE_DIR = "quarantine"
+QUARANTINE_FILE = os.path.join(QUARANTINE_DIR, "quarantine.csv")
+
+HISTORY_WINDOW = 30      # recent points used for move and spread statistics
+MIN_HISTORY = 5          # fewer points than this and the statistical checks are skipped
+MAX_ZSCORE = 8.0         # largest accepted z-score of a day-over-day log move
+SPREAD_TOLERANCE = 0.02  # spread range is widened by this fraction of the price
+MAX_DATE_SKEW_DAYS = 7   # largest accepted gap between row date and filename date
+CONFIRM_CIRCULARS = 3    # consecutive circulars within SPREAD_TOLERANCE that confirm a new level
+
+FILENAME_DATE_FORMATS = [
+    "Hindalco_Circular_%d_%b_%y.pdf",
+    "primary-ready-reckoner-%d-%B-%Y.pdf",
+    "primary-ready-reckoner-%d-%b-%Y.pdf",
+]
+
+class Series:
+    """One product's history: sorted dates with aligned price and spread arrays"""
+
+    def __init__(self, dates, prices, spreads):
+        self.dates = dates
+        self.prices = prices
+        self.spreads = spreads
+
+def source_date_from_filename(path):
+    """Publication date encoded in a circular's filename, or None"""
+    name = os.path.basename(path)
+    for fmt in FILENAME_DATE_FORMATS:
+        try:
+            return datetime.strptime(name, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return None
+
+def daily_medians(series):
+    """Median price across products for every date in {product: {date: price}}"""
+    by_date = {}
+    for prices in series.values():
+        for date, price in prices.items():
+            by_date.setdefault(date, []).append(price)
+    return {date: statistics.median(prices) for date, prices in by_date.items()}
+
+def build_history(series):
+    """Turn {product: {date: price}} into {product: Series}"""
+    medians = daily_medians(series)
+    history = {}
+    for product, prices in series.items():
+        dates = sorted(prices)
+        values = array("q", (prices[d] for d in dates))
+        spreads = array("d", (prices[d] - medians[d] for d in dates))
+        history[product] = Series(dates, values, spreads)
+    return history
+
+def load_history(csv_dir=CSV_DIR):
+    return build_history(load_product_series(csv_dir))
+
+def check_point(prices, spreads, i):
+    """Statistical checks of point i against the points before it"""
+    reasons = []
+    start = max(1, i - HISTORY_WINDOW)
+    if i - start >= MIN_HISTORY:
+        moves = [math.log(prices[k] / prices[k - 1]) for k in range(start, i)]
+        mean = sum(moves) / len(moves)
+        std = math.sqrt(sum((m - mean) ** 2 for m in moves) / len(moves))
+        move = math.log(prices[i] / prices[i - 1])
+        if std > 0 and abs(move - mean) / std > MAX_ZSCORE:
+            reasons.append(f"day-over-day move {move:+.1%} is {abs(move - mean) / std:.1f} sd from recent moves")
+
+    recent = spreads[max(0, i - HISTORY_WINDOW):i]
+    if len(recent) >= MIN_HISTORY and not math.isnan(spreads[i]):
+        margin = SPREAD_TOLERANCE * prices[i]
+        low, high = min(recent) - margin, max(recent) + margin
+        if not low <= spreads[i] <= high:
+            reasons.append(f"spread to daily median {spreads[i]:+,.0f} outside recent range "
+                           f"{min(recent):+,.0f}..{max(recent):+,.0f}")
+    return reasons
+
+def check_date(date, source_date):
+    if not source_date:
+        return []
+    skew = abs((datetime.strptime(date, "%Y-%m-%d") - datetime.strptime(source_date, "%Y-%m-%d")).days)
+    if skew > MAX_DATE_SKEW_DAYS:
+        return [f"date {date} is {skew} days from source date {source_date}"]
+    return []
+
+def agrees(price, level):
+    return abs(price - level) <= SPREAD_TOLERANCE * level
+
+def confirmed_run(candidates, price):
+    """Trailing candidates that agree with price, if with it they confirm a new level"""
+    run = []
+    for candidate in reversed(candidates):
+        if not agrees(candidate[0][2], price):
+            break
+        run.insert(0, candidate)
+    return run if len(run) + 1 >= CONFIRM_CIRCULARS else None
+
+def load_pending(history, quarantine_file=QUARANTINE_FILE):
+    """Quarantined rows that could still start a new level, as {product: [(row, source, sha256)]}
+
+    Only rows dated after the product's latest accepted date and close to
+    their source date count; anything older was superseded by later circulars.
+    """
+    if not os.path.exists(quarantine_file):
+        return {}
+    by_product = {}
+    with open(quarantine_file, "r", newline="") as f:
+        for entry in csv.DictReader(f):
+            product, date = entry["Product"], entry["Date"]
+            series = history.get(product)
+            if not series or not series.dates or date <= series.dates[-1]:
+                continue
+            if check_date(date, source_date_from_filename(entry["Source"])):
+                continue
+            row = (date, product, int(entry["Price"]))
+            # A later flag for the same date replaces the earlier one
+            by_product.setdefault(product, {})[date] = (row, entry["Source"], entry["Source SHA-256"] or None)
+    return {product: [by_date[d] for d in sorted(by_date)] for product, by_date in by_product.items()}
+
+def validate_rows(rows, history=None, source_date=None, pending=None):
+    """Split freshly extracted (date, product, price) rows into accepted and rejected
+
+    Rows repeating a date already in history with the same price are
+    accepted (the CSV writer skips them). A row failing only the statistical
+    checks is accepted when it confirms a new level together with the
+    pending quarantined rows before it; those rows are then released.
+    Returns (accepted, rejected, released): rejected holds (row, reasons)
+    pairs, released holds (row, source, source_sha256) from the quarantine.
+    """
+    if history is None:
+        history = load_history()
+    if pending is None:
+        pending = load_pending(history)
+
+    batch = {}
+    for date, product, price in rows:
+        batch.setdefault(date, []).append(price)
+    medians = {date: statistics.median(prices) if len(prices) >= 3 else float("nan")
+               for date, prices in batch.items()}
+
+    accepted, rejected, released = [], [], []
+    for row in rows:
+        date, product, price = row
+        reasons = check_date(date, source_date)
+        series = history.get(product)
+
+        if series and series.dates:
+            if date in series.dates:
+                existing = series.prices[series.dates.index(date)]
+                if existing != price:
+                    reasons.append(f"duplicate date {date} conflicts with existing price {existing:,}")
+            elif date < series.dates[-1]:
+                reasons.append(f"out-of-order date {date} before latest {series.dates[-1]}")
+            else:
+                prices = series.prices + array("q", [price])
+                spreads = series.spreads + array("d", [price - medians[date]])
+                outlier = check_point(prices, spreads, len(prices) - 1)
+                run = None
+                if outlier and not reasons:
+                    run = confirmed_run([c for c in pending.get(product, []) if c[0][0] < date], price)
+                if run is not None:
+                    print(f"   🔓 New level for {product} confirmed by {len(run) + 1} circulars, "
+                          f"releasing {len(run)} quarantined rows")
+                    released.extend(run)
+                else:
+                    reasons.extend(outlier)
+
+        if reasons:
+            rejected.append((row, reasons))
+        else:
+            accepted.append(row)
+    return accepted, rejected, released
+
+def validate_sources(pairs):
+    """Per-circular checks for the bulk path, on (source, (date, product, price)) pairs
+
+    Flags rows dated far from their source filename's date and every row of
+    a (product, date) that circulars report with different prices. Returns
+    (accepted, flagged): accepted pairs and (source, row, reasons) triples.
+    """
+    # Misdated rows are left out of the duplicate check so they cannot taint a good date
+    date_reasons = [check_date(date, source_date_from_filename(source)) for source, (date, _, _) in pairs]
+    prices = {}
+    for (source, (date, product, price)), reasons in zip(pairs, date_reasons):
+        if not reasons:
+            prices.setdefault((product, date), set()).add(price)
+
+    accepted, flagged = [], []
+    for (source, row), reasons in zip(pairs, date_reasons):
+        date, product, price = row
+        others = prices.get((product, date), set()) - {price}
+        if others:
+            reasons.append(f"duplicate date {date} conflicts with "
+                           f"{', '.join(f'{p:,}' for p in sorted(others))} in other circulars")
+        if reasons:
+            flagged.append((source, row, reasons))
+        else:
+            accepted.append((source, row))
+    return accepted, flagged
+
+def validate_history(series):
+    """Walk every product's full history in date order; returns (row, reasons) for each outlier
+
+    A point that the next CONFIRM_CIRCULARS - 1 points agree with starts a
+    new level and is kept; a spike that reverts is flagged.
+    """
+    flagged = []
+    for product, s in build_history(series).items():
+        for i in range(1, len(s.dates)):
+            reasons = check_point(s.prices, s.spreads, i)
+            following = s.prices[i + 1:i + CONFIRM_CIRCULARS]
+            if reasons and len(following) == CONFIRM_CIRCULARS - 1 and all(agrees(p, s.prices[i]) for p in following):
+                continue
+            if reasons:
+                flagged.append(((s.dates[i], product, s.prices[i]), reasons))
+    return flagged
+
+def quarantine_rows(rejected, source, source_sha256=None):
+    """Append rejected rows with their reasons to the quarantine file"""
+    os.makedirs(QUARANTINE_DIR, exist_ok=True)
+    new_file = not os.path.exists(QUARANTINE_FILE)
+    flagged_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(QUARANTINE_FILE, "a", newline="") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["Flagged At", "Source", "Source SHA-256", "Date", "Product", "Price", "Reasons"])
+        for (date, product, price), reasons in rejected:
+            writer.writerow([flagged_at, source, source_sha256 or "", date, product, price, "; ".join(reasons)])
+            print(f"   🚧 Quarantined {product} {date} ₹{price:,}: {'; '.join(reasons)}")
+
+if __name__ == "__main__":
+    import time
+    print("🔍 Validating full price history...")
+    started = time.perf_counter()
+    flagged = validate_history(load_product_series())
+    elapsed = (time.perf_counter() - started) * 1000
+    for (date, product, price), reasons in flagged:
+        print(f"   ⚠️ {date} {product} ₹{price:,}: {'; '.join(reasons)}")
+    print(f"📊 {len(flagged)} outliers found in {elapsed:.1f} ms")